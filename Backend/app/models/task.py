@@ -1,6 +1,12 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 
 class UpdateTaskStatusRequest(BaseModel):
     status: str
-    action_done_by: Optional[str] = None 
\ No newline at end of file
+    action_done_by: Optional[str] = None
+
+class GeneratedTaskOutput(BaseModel):
+    description: str = Field(description="Clear, actionable task for responders (1-2 sentences)")
+    roles: Literal["vol", "fr", "both"] = Field(description="Responder roles to assign")
+    reasoning: str = Field(description="Brief explanation of role assignment")
+    resource_utilization: str = Field(description="How to use nearby resources or 'none'")
@@ -8,6 +8,7 @@ from appwrite.exception import AppwriteException
 from appwrite.id import ID
 from appwrite.query import Query
 from appwrite.id import ID
+import httpx
 import os
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
@@ -15,6 +16,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class AppwriteService:
+    # One keep-alive connection pool for the whole process instead of one per instance
+    _http_client: Optional[httpx.AsyncClient] = None
+
     def __init__(self):
         # Initialize Appwrite client
         self.client = Client()
@@ -62,6 +66,53 @@ class AppwriteService:
         self.databases = Databases(self.client)
         self.users = Users(self.client)
         self.storage = Storage(self.client)  # Add storage service initialization
+
+        # Headers for the async REST calls used by the emergency request workflow
+        self.http_headers = {
+            "X-Appwrite-Project": self.project_id,
+            "X-Appwrite-Key": self.api_key,
+            "Content-Type": "application/json",
+        }
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """Return the process-wide async HTTP client, shared by all service instances"""
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+            )
+        return cls._http_client
+
+    @classmethod
+    async def aclose_http_client(cls) -> None:
+        """Close the shared async HTTP client (called on application shutdown)"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+
+    async def _arequest(self, method: str, path: str, params=None, json=None) -> Dict[str, Any]:
+        """Send a request to the Appwrite REST API without blocking the event loop"""
+        try:
+            response = await self.get_http_client().request(
+                method, f"{self.endpoint}{path}", params=params, json=json, headers=self.http_headers
+            )
+        except httpx.HTTPError as e:
+            raise AppwriteException(f"Request to Appwrite failed: {e}")
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"message": response.text}
+            raise AppwriteException(body.get("message"), response.status_code, body.get("type"), response.text)
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    def _documents_path(self, collection_id: str, document_id: Optional[str] = None) -> str:
+        path = f"/databases/{self.database_id}/collections/{collection_id}/documents"
+        if document_id:
+            path += f"/{document_id}"
+        return path
     
     def create_user_account(self, email: str, password: str, name: str) -> Dict[str, Any]:
         """Create a new user account in Appwrite Auth"""
@@ -398,4 +449,98 @@ class AppwriteService:
             )
             return documents.get("documents", [])
         except AppwriteException as e:
-            raise Exception(f"Failed to list tasks: {e.message}")
\ No newline at end of file
+            raise Exception(f"Failed to list tasks: {e.message}")
+
+    async def aget_disaster_document(self, disaster_id: str) -> dict:
+        """Async version of get_disaster_document."""
+        try:
+            return await self._arequest("GET", self._documents_path(self.disasters_collection_id, disaster_id))
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to get disaster document: {e.message}", e.code, e.type, e.response)
+
+    async def alist_resources_for_disaster(self, disaster_id: str) -> list:
+        """Async version of list_resources_for_disaster."""
+        try:
+            documents = await self._arequest(
+                "GET",
+                self._documents_path(self.resources_collection_id),
+                params=[("queries[]", Query.equal("disaster_id", disaster_id)), ("queries[]", Query.limit(100))]
+            )
+            return documents.get("documents", [])
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to list resources: {e.message}", e.code, e.type, e.response)
+
+    async def alist_resources_in_bbox(self, disaster_id: str, lat_min: float, lat_max: float, lon_min: float, lon_max: float, limit: int = 100) -> list:
+        """List resources for a disaster inside a lat/lon bounding box.
+
+        Needs numeric latitude/longitude attributes, ideally covered by a
+        (disaster_id, latitude, longitude) index.
+        """
+        try:
+            documents = await self._arequest(
+                "GET",
+                self._documents_path(self.resources_collection_id),
+                params=[
+                    ("queries[]", Query.equal("disaster_id", disaster_id)),
+                    ("queries[]", Query.greater_than_equal("latitude", lat_min)),
+                    ("queries[]", Query.less_than_equal("latitude", lat_max)),
+                    ("queries[]", Query.greater_than_equal("longitude", lon_min)),
+                    ("queries[]", Query.less_than_equal("longitude", lon_max)),
+                    ("queries[]", Query.limit(limit))
+                ]
+            )
+            return documents.get("documents", [])
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to list resources: {e.message}", e.code, e.type, e.response)
+
+    async def alist_tasks_by_user_and_disaster(self, user_id: str, disaster_id: str) -> list:
+        """Async version of list_tasks_by_user_and_disaster."""
+        try:
+            documents = await self._arequest(
+                "GET",
+                self._documents_path(self.tasks_collection_Id),
+                params=[
+                    ("queries[]", Query.equal("user_id", user_id)),
+                    ("queries[]", Query.equal("disaster_id", disaster_id)),
+                    ("queries[]", Query.limit(100))
+                ]
+            )
+            return documents.get("documents", [])
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to list tasks: {e.message}", e.code, e.type, e.response)
+
+    async def asave_task_document(self, task_data: dict) -> dict:
+        """Async version of save_task_document."""
+        try:
+            return await self._arequest(
+                "POST",
+                self._documents_path(self.tasks_collection_Id),
+                json={"documentId": task_data['task_id'], "data": task_data}
+            )
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to save task document: {e.message}", e.code, e.type, e.response)
+
+    async def adelete_task_document(self, task_id: str):
+        """Delete a task document from the tasks collection without blocking."""
+        try:
+            await self._arequest("DELETE", self._documents_path(self.tasks_collection_Id, task_id))
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to delete task: {e.message}", e.code, e.type, e.response)
+
+    async def asave_user_request_document(self, user_id: str, user_request_data: dict) -> dict:
+        """Async version of save_user_request_document."""
+        try:
+            return await self._arequest(
+                "POST",
+                self._documents_path(self.user_requests_collection_id),
+                json={"documentId": user_id, "data": user_request_data}
+            )
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to save user request: {e.message}", e.code, e.type, e.response)
+
+    async def adelete_user_request_document(self, document_id: str):
+        """Async version of delete_user_request_document."""
+        try:
+            await self._arequest("DELETE", self._documents_path(self.user_requests_collection_id, document_id))
+        except AppwriteException as e:
+            raise AppwriteException(f"Failed to delete user request: {e.message}", e.code, e.type, e.response)
@@ -1,20 +1,143 @@
-from langgraph.graph import StateGraph
-from typing import TypedDict
-import uuid
+from typing import TypedDict, Optional
+import secrets
+import asyncio
 from langchain_google_genai import ChatGoogleGenerativeAI
 import os
 import math
-import json
+import re
+import numpy as np
+from cachetools import TTLCache
 from app.services.appwrite_service import AppwriteService
+from appwrite.exception import AppwriteException
+from app.models.task import GeneratedTaskOutput
 from dotenv import load_dotenv
 
 load_dotenv()
 
 appwrite_service = AppwriteService()
 
+# Module-level client: its async gRPC channel is created once and multiplexes
+# concurrent ainvoke calls from all requests
 gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash", google_api_key=os.getenv("GOOGLE_API_KEY")
+    model="gemini-2.0-flash",
+    google_api_key=os.getenv("GOOGLE_API_KEY"),
+    max_retries=2,
+    timeout=20,
 )
+# Returns a parsed GeneratedTaskOutput instead of free-text JSON
+gemini_task_output = gemini.with_structured_output(GeneratedTaskOutput)
+
+
+NEARBY_RESOURCE_LIMIT = 5
+NEARBY_RESOURCE_RADIUS_KM = 50
+BBOX_CANDIDATE_LIMIT = 100
+# The bounding-box resource query needs numeric, indexed latitude/longitude
+# attributes on the resources collection, so it is opt-in
+_bbox_query_enabled = os.getenv("APPWRITE_RESOURCE_BBOX_QUERY", "false").lower() == "true"
+KM_PER_DEGREE = 111.32
+
+
+# Fixed instructions sent as the system message; only the request details vary per call
+EMERGENCY_TASK_SYSTEM_PROMPT = """
+You are an emergency response coordinator AI. A citizen has submitted an emergency request during a disaster. Create an actionable response task and assign the appropriate responder roles.
+
+CRITICAL: Most requests are LEGITIMATE emergency needs (food, water, shelter, supplies, medical help, rescue, evacuation). Only flag as inappropriate if the request is clearly sexual, abusive, or a prank (e.g., "send kiss", "haha joke").
+
+ROLES:
+- "vol" (Volunteers): food, water, shelter, supplies, welfare checks, non-medical assistance
+- "fr" (First Responders): medical emergencies, injuries, rescue, fire, life-threatening situations
+- "both": mass casualties, large groups, or complex situations needing professional and volunteer support
+- Inappropriate (sexual/prank) requests get a verification task for "vol"
+
+EXAMPLES:
+- "Need food" -> roles "vol": "Deliver food supplies to hungry person at location"
+- "Broken leg" -> roles "fr": "Provide medical assistance to person with leg injury"
+
+DO NOT ask questions or inquire - CREATE A TASK.
+"""
+
+# Request keyword categories, matched against whole words of the help text. Common
+# plural and verb forms are listed explicitly since there is no substring matching
+INAPPROPRIATE_KEYWORDS = frozenset(
+    {
+        "sexy",
+        "kiss",
+        "kisses",
+        "kissing",
+        "love",
+        "haha",
+        "lol",
+        "prank",
+        "pranks",
+        "joke",
+        "jokes",
+        "joking",
+        "fake",
+    }
+)
+FOOD_KEYWORDS = frozenset(
+    {
+        "food",
+        "foods",
+        "hungry",
+        "hunger",
+        "starving",
+        "starve",
+        "starved",
+        "eat",
+        "eating",
+        "meal",
+        "meals",
+    }
+)
+# Kept apart from food: in floods "water" usually describes the hazard, not a supply need
+WATER_KEYWORDS = frozenset(
+    {"water", "thirsty", "thirst", "drink", "drinks", "drinking"}
+)
+MEDICAL_KEYWORDS = frozenset(
+    {
+        "medical",
+        "injury",
+        "injuries",
+        "injured",
+        "hurt",
+        "hurts",
+        "bleed",
+        "bleeds",
+        "bleeding",
+        "unconscious",
+        "rescue",
+        "trapped",
+        "fire",
+        "fires",
+        "pain",
+        "sick",
+        "ill",
+    }
+)
+MASS_KEYWORDS = frozenset({"crowd", "group", "families", "everyone"})
+# Multi-word keywords can't be matched per token and are checked as substrings
+MASS_PHRASES = ("many people", "multiple people")
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def match_request_keywords(text: str) -> set:
+    """Return the keyword categories ('bad', 'food', 'water', 'med', 'mass') found in text."""
+    text = text.lower()
+    tokens = set(_WORD_RE.findall(text))
+    hits = set()
+    if tokens & INAPPROPRIATE_KEYWORDS:
+        hits.add("bad")
+    if tokens & FOOD_KEYWORDS:
+        hits.add("food")
+    if tokens & WATER_KEYWORDS:
+        hits.add("water")
+    if tokens & MEDICAL_KEYWORDS:
+        hits.add("med")
+    if tokens & MASS_KEYWORDS or any(phrase in text for phrase in MASS_PHRASES):
+        hits.add("mass")
+    return hits
 
 
 class EmergencyRequestState(TypedDict):
@@ -22,45 +145,181 @@ class EmergencyRequestState(TypedDict):
     user_id: str
     help: str
     urgency_type: str
-    latitude: str
-    longitude: str
+    latitude: float
+    longitude: float
     emergency_type: str
     nearby_resources: list
     generated_task: dict
     user_request_data: dict
 
 
-def fetch_disaster_type(state: EmergencyRequestState) -> EmergencyRequestState:
+# Disaster documents rarely change while a disaster is active, so bursts of requests
+# for the same disaster share one lookup
+_disaster_cache = TTLCache(maxsize=1024, ttl=60)
+_disaster_fetches = {}
+
+
+async def _load_disaster_document(disaster_id: str) -> dict:
+    document = await appwrite_service.aget_disaster_document(disaster_id)
+    _disaster_cache[disaster_id] = document
+    return document
+
+
+async def get_cached_disaster_document(disaster_id: str) -> dict:
+    """Return the disaster document, sharing one in-flight fetch per disaster_id."""
+    document = _disaster_cache.get(disaster_id)
+    if document is not None:
+        return document
+    fetch = _disaster_fetches.get(disaster_id)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_load_disaster_document(disaster_id))
+        _disaster_fetches[disaster_id] = fetch
+        fetch.add_done_callback(lambda _: _disaster_fetches.pop(disaster_id, None))
+    # Shield so one cancelled request does not cancel the fetch for the others
+    return await asyncio.shield(fetch)
+
+
+async def fetch_disaster_type(state: EmergencyRequestState) -> str:
     try:
-        document = appwrite_service.get_disaster_document(state["disaster_id"])
-        emergency_type = document.get("emergency_type", "general emergency")
-        return {**state, "emergency_type": emergency_type}
-    except Exception as e:
+        document = await get_cached_disaster_document(state["disaster_id"])
+        return document.get("emergency_type", "general emergency")
+    except AppwriteException as e:
         raise ValueError(f"Disaster data not found: {e}")
 
 
-def fetch_nearby_resources(state: EmergencyRequestState) -> EmergencyRequestState:
+def rank_nearby_resources(documents: list, user_lat: float, user_lon: float) -> list:
+    """Return the closest located resources to the user, nearest first."""
+    located = [
+        doc for doc in documents if doc.get("latitude") and doc.get("longitude")
+    ]
+    if not located:
+        return []
+    lats = np.fromiter(
+        (float(doc["latitude"]) for doc in located),
+        dtype=np.float64,
+        count=len(located),
+    )
+    lons = np.fromiter(
+        (float(doc["longitude"]) for doc in located),
+        dtype=np.float64,
+        count=len(located),
+    )
+    # Equirectangular approximation: scale longitude by cos(latitude) so ranking
+    # stays correct away from the equator, and wrap across the antimeridian.
+    # Squared distance is enough for ranking, sqrt is only taken for the top results
+    cos_user = math.cos(math.radians(user_lat))
+    dy = lats - user_lat
+    dx = ((lons - user_lon + 180.0) % 360.0 - 180.0) * cos_user
+    dist2 = dy * dy + dx * dx
+    if len(dist2) > NEARBY_RESOURCE_LIMIT:
+        idx = np.argpartition(dist2, NEARBY_RESOURCE_LIMIT)[:NEARBY_RESOURCE_LIMIT]
+    else:
+        idx = np.arange(len(dist2))
+    idx = idx[np.argsort(dist2[idx])]
+    distances = np.sqrt(dist2[idx]) * KM_PER_DEGREE
+    return [
+        {
+            **located[i],
+            "distance": float(distance),
+            "resource_id": located[i]["$id"],
+        }
+        for i, distance in zip(idx.tolist(), distances.tolist())
+    ]
+
+
+async def fetch_resources_near(
+    disaster_id: str, user_lat: float, user_lon: float
+) -> Optional[list]:
+    """Fetch resources in a bounding box around the user, or None if the box can't be used."""
+    global _bbox_query_enabled
+    if not _bbox_query_enabled:
+        return None
+    # The box is skipped near the poles and across the antimeridian
+    cos_user = math.cos(math.radians(user_lat))
+    lat_delta = NEARBY_RESOURCE_RADIUS_KM / KM_PER_DEGREE
+    if cos_user < 0.01:
+        return None
+    lon_delta = NEARBY_RESOURCE_RADIUS_KM / (KM_PER_DEGREE * cos_user)
+    if abs(user_lon) + lon_delta > 180.0:
+        return None
+    try:
+        return await appwrite_service.alist_resources_in_bbox(
+            disaster_id,
+            user_lat - lat_delta,
+            user_lat + lat_delta,
+            user_lon - lon_delta,
+            user_lon + lon_delta,
+            limit=BBOX_CANDIDATE_LIMIT,
+        )
+    except AppwriteException as e:
+        # An invalid query means the collection lacks numeric latitude/longitude
+        # attributes; stop paying for a rejected call on every request
+        if e.type == "general_query_invalid":
+            _bbox_query_enabled = False
+        return None
+
+
+async def fetch_nearby_resources(state: EmergencyRequestState) -> list:
+    user_lat = state["latitude"]
+    user_lon = state["longitude"]
     try:
-        documents = appwrite_service.list_resources_for_disaster(state["disaster_id"])
-        nearby_resources = []
-        user_lat = float(state["latitude"])
-        user_lon = float(state["longitude"])
-        for doc in documents:
-            if doc.get("latitude") and doc.get("longitude"):
-                resource_lat = float(doc["latitude"])
-                resource_lon = float(doc["longitude"])
-                distance = math.sqrt(
-                    (user_lat - resource_lat) ** 2 + (user_lon - resource_lon) ** 2
-                )
-                resource_data = {**doc, "distance": distance, "resource_id": doc["$id"]}
-                nearby_resources.append(resource_data)
-        nearby_resources.sort(key=lambda x: x.get("distance", float("inf")))
-        return {**state, "nearby_resources": nearby_resources[:5]}
-    except Exception as e:
-        return {**state, "nearby_resources": []}
-
-
-def generate_emergency_task(state: EmergencyRequestState) -> EmergencyRequestState:
+        candidates = await fetch_resources_near(state["disaster_id"], user_lat, user_lon)
+        # A full page may have cut off closer resources, so it is inconclusive
+        if candidates is not None and len(candidates) < BBOX_CANDIDATE_LIMIT:
+            nearby_resources = rank_nearby_resources(candidates, user_lat, user_lon)
+            # The box result is exact only if enough resources lie within the radius;
+            # anything outside it could be closer than a resource in the box corner
+            if (
+                len(nearby_resources) == NEARBY_RESOURCE_LIMIT
+                and nearby_resources[-1]["distance"] <= NEARBY_RESOURCE_RADIUS_KM
+            ):
+                return nearby_resources
+        documents = await appwrite_service.alist_resources_for_disaster(
+            state["disaster_id"]
+        )
+        return rank_nearby_resources(documents, user_lat, user_lon)
+    except (AppwriteException, ValueError):
+        # ValueError covers resources with malformed coordinates
+        return []
+
+
+def build_request_task(
+    state: EmergencyRequestState,
+    urgency: str,
+    description: str,
+    roles: list,
+    is_fallback: bool,
+    ai_reasoning: str,
+    **extra,
+) -> dict:
+    return {
+        "task_id": secrets.token_hex(16),
+        "description": description,
+        "status": "pending",
+        "action_done_by": "",
+        "roles": roles,
+        "emergency_type": state["emergency_type"],
+        "urgency_level": urgency,
+        "latitude": state["latitude"],
+        "longitude": state["longitude"],
+        "help_needed": state["help"],
+        "user_id": state["user_id"],
+        "disaster_id": state["disaster_id"],
+        "is_fallback": is_fallback,
+        "first_Task": False,
+        "ai_reasoning": ai_reasoning,
+        **extra,
+    }
+
+
+def describe_resource_coordination(nearby_resources: list) -> str:
+    if not nearby_resources:
+        return ""
+    closest_resource = nearby_resources[0]
+    return f" Coordinate with {closest_resource.get('name', 'nearby resource')} for assistance."
+
+
+async def generate_emergency_task(state: EmergencyRequestState) -> dict:
     help_needed = state["help"]
     urgency = state["urgency_type"]
     emergency_type = state["emergency_type"]
@@ -69,6 +328,30 @@ def generate_emergency_task(state: EmergencyRequestState) -> EmergencyRequestSta
     nearby_resources = state["nearby_resources"]
     if urgency == "moderate":
         urgency = "medium"
+    # Requests that clearly fall into a single category don't need the LLM. High
+    # urgency goes to first responders in the fallback, so food-only requests are
+    # only short-circuited below that to keep both deterministic paths consistent.
+    # Water words never short-circuit since they often describe the hazard itself
+    keyword_hits = match_request_keywords(help_needed)
+    if keyword_hits == {"food"} and urgency != "high":
+        description = f"Deliver food and water supplies to person at location ({latitude}, {longitude})."
+        roles = ["vol"]
+    elif keyword_hits == {"med"}:
+        description = f"Provide immediate medical assistance to person needing {help_needed} at location ({latitude}, {longitude})."
+        roles = ["fr"]
+    else:
+        description = None
+    if description:
+        description += describe_resource_coordination(nearby_resources)
+        task = build_request_task(
+            state,
+            urgency,
+            description,
+            roles,
+            is_fallback=False,
+            ai_reasoning="deterministic keyword match",
+        )
+        return {"generated_task": task}
     resource_info = ""
     if nearby_resources:
         resource_info = "Available nearby resources:\n"
@@ -81,151 +364,52 @@ def generate_emergency_task(state: EmergencyRequestState) -> EmergencyRequestSta
             resource_info += f"  Status: {resource.get('status', 'unknown')}\n"
     else:
         resource_info = "No nearby resources identified."
-    prompt = f"""
-    You are an emergency response coordinator AI. A citizen has submitted an emergency request during a disaster. Your job is to create an actionable response task and assign the appropriate responder roles.
-
-    CRITICAL: Most requests are LEGITIMATE emergency needs. Only flag as inappropriate if the request is clearly sexual, abusive, or a prank (e.g., "send kiss", "sexy time", "haha joke", "prank call").
-
-    LEGITIMATE EMERGENCY NEEDS INCLUDE:
-    - Food, water, shelter (ALWAYS legitimate - assign to volunteers)
-    - Medical help, injuries, rescue (ALWAYS legitimate - assign to first responders)
-    - Evacuation, safety concerns (ALWAYS legitimate)
-    - Basic supplies, clothing, sanitation (ALWAYS legitimate - assign to volunteers)
-
-    EMERGENCY REQUEST DETAILS:
-    Emergency Type: {emergency_type}
-    Help Needed: {help_needed}
-    Urgency Level: {urgency}
-    Location: ({latitude}, {longitude})
-
-    {resource_info}
-
-    AVAILABLE RESPONDER ROLES:
-    - "vol" (Volunteers): For food, water, shelter, supplies, basic needs, welfare checks, non-medical assistance
-    - "fr" (First Responders): For medical emergencies, injuries, rescue operations, fire, life-threatening situations
-    - "both": For large-scale disasters affecting many people, mass casualties, or complex situations needing both professional and volunteer support
-
-    ROLE ASSIGNMENT RULES:
-    1. Food/Water/Hunger/Thirst/Supplies → "vol"
-    2. Medical/Injury/Bleeding/Rescue/Fire → "fr"
-    3. Mass casualties/Large groups/Complex disasters → "both"
-    4. If inappropriate (sexual/prank) → create verification task for "vol"
-
-    Generate JSON response:
-    {{
-        "description": "Clear, actionable task for responders (1-2 sentences). For food requests say 'Deliver food supplies to person at location'. For medical say 'Provide medical assistance to injured person at location'.",
-        "roles": "exactly one: 'vol', 'fr', or 'both'",
-        "reasoning": "Brief explanation of role assignment",
-        "resource_utilization": "How to use nearby resources or 'none'"
-    }}
-
-    EXAMPLES:
-    - "Need food" → {{"description": "Deliver food supplies to hungry person at location", "roles": "vol"}}
-    - "Send sexy kiss" → {{"description": "Verify request details and assess if legitimate emergency assistance needed", "roles": "vol"}}
-    - "Broken leg" → {{"description": "Provide medical assistance to person with leg injury", "roles": "fr"}}
-
-    Respond ONLY with valid JSON. DO NOT ask questions or inquire - CREATE A TASK.
-    """
+    prompt = (
+        f"Emergency Type: {emergency_type}\n"
+        f"Help Needed: {help_needed}\n"
+        f"Urgency Level: {urgency}\n"
+        f"Location: ({latitude}, {longitude})\n\n"
+        f"{resource_info}"
+    )
     try:
-        messages = [{"role": "user", "content": prompt}]
-        response = gemini.invoke(messages)
-        ai_response = response.content.strip()
-        if ai_response.startswith("```json"):
-            ai_response = ai_response.replace("```json", "").replace("```", "").strip()
-        elif ai_response.startswith("```"):
-            ai_response = ai_response.replace("```", "").strip()
-        ai_data = json.loads(ai_response)
-        ai_generated_description = ai_data.get("description", "").strip()
-        ai_selected_role = ai_data.get("roles", "vol")
-        if ai_selected_role == "both":
+        messages = [
+            {"role": "system", "content": EMERGENCY_TASK_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        result = await gemini_task_output.ainvoke(messages)
+        if result is None:
+            raise ValueError("No structured output from Gemini")
+        ai_generated_description = result.description.strip()
+        if result.roles == "both":
             valid_roles = ["vol", "fr"]
-        elif ai_selected_role in ["vol", "fr"]:
-            valid_roles = [ai_selected_role]
         else:
-            valid_roles = ["vol"]
+            valid_roles = [result.roles]
         if not ai_generated_description:
             raise ValueError("Empty description from Gemini")
-        task_id = str(uuid.uuid4())
-        task = {
-            "task_id": task_id,
-            "description": ai_generated_description,
-            "status": "pending",
-            "action_done_by": "",
-            "roles": valid_roles,
-            "emergency_type": emergency_type,
-            "urgency_level": urgency,
-            "latitude": float(latitude),
-            "longitude": float(longitude),
-            "help_needed": help_needed,
-            "user_id": state["user_id"],
-            "disaster_id": state["disaster_id"],
-            "is_fallback": False,
-            "first_Task": False,
-            "ai_reasoning": ai_data.get("reasoning", "AI-determined role assignment"),
-            "resource_utilization": ai_data.get("resource_utilization", "none"),
-        }
-        return {**state, "generated_task": task}
-    except Exception as e:
+        task = build_request_task(
+            state,
+            urgency,
+            ai_generated_description,
+            valid_roles,
+            is_fallback=False,
+            ai_reasoning=result.reasoning or "AI-determined role assignment",
+            resource_utilization=result.resource_utilization or "none",
+        )
+        return {"generated_task": task}
+    except Exception:
         # Fallback logic with better keyword detection
-        help_lower = help_needed.lower()
         emergency_lower = emergency_type.lower()
 
         # Check for truly inappropriate content (sexual, prank)
-        inappropriate_keywords = [
-            "sexy",
-            "kiss",
-            "love",
-            "haha",
-            "lol",
-            "prank",
-            "joke",
-            "fake",
-        ]
-        is_inappropriate = any(
-            keyword in help_lower for keyword in inappropriate_keywords
-        )
+        is_inappropriate = "bad" in keyword_hits
 
         if is_inappropriate:
             description = "Verify request details and assess if legitimate emergency assistance is needed."
             roles = ["vol"]
         else:
-            # Legitimate emergency keywords
-            food_keywords = [
-                "food",
-                "hungry",
-                "hunger",
-                "starving",
-                "eat",
-                "meal",
-                "water",
-                "thirsty",
-                "drink",
-            ]
-            medical_keywords = [
-                "medical",
-                "injury",
-                "hurt",
-                "bleeding",
-                "unconscious",
-                "rescue",
-                "trapped",
-                "fire",
-                "pain",
-                "sick",
-                "ill",
-            ]
-            mass_keywords = [
-                "many people",
-                "multiple people",
-                "crowd",
-                "group",
-                "families",
-                "everyone",
-            ]
-
-            needs_food = any(keyword in help_lower for keyword in food_keywords)
-            needs_medical = any(keyword in help_lower for keyword in medical_keywords)
-            mass_casualty = any(keyword in help_lower for keyword in mass_keywords)
+            needs_food = "food" in keyword_hits or "water" in keyword_hits
+            needs_medical = "med" in keyword_hits
+            mass_casualty = "mass" in keyword_hits
 
             if mass_casualty and (needs_medical or urgency == "high"):
                 description = f"Coordinate emergency response for multiple people needing {help_needed} at location ({latitude}, {longitude})."
@@ -241,70 +425,67 @@ def generate_emergency_task(state: EmergencyRequestState) -> EmergencyRequestSta
                 roles = ["vol"]
 
             # Add resource coordination if available
-            if nearby_resources:
-                closest_resource = nearby_resources[0]
-                description += f" Coordinate with {closest_resource.get('name', 'nearby resource')} for assistance."
-
-        task_id = str(uuid.uuid4())
-        task = {
-            "task_id": task_id,
-            "description": description,
-            "status": "pending",
-            "action_done_by": "",
-            "roles": roles,
-            "emergency_type": emergency_type,
-            "urgency_level": urgency,
-            "latitude": float(latitude),
-            "longitude": float(longitude),
-            "help_needed": help_needed,
-            "user_id": state["user_id"],
-            "disaster_id": state["disaster_id"],
-            "first_Task": False,
-            "is_fallback": True,
-            "ai_reasoning": "Intelligent fallback assignment based on context analysis",
-        }
-        return {**state, "generated_task": task}
+            description += describe_resource_coordination(nearby_resources)
+
+        task = build_request_task(
+            state,
+            urgency,
+            description,
+            roles,
+            is_fallback=True,
+            ai_reasoning="Intelligent fallback assignment based on context analysis",
+        )
+        return {"generated_task": task}
 
 
-def save_task_to_db(state: EmergencyRequestState) -> EmergencyRequestState:
+async def save_task_to_db(state: EmergencyRequestState) -> None:
     user_id = state["user_id"]
     disaster_id = state["disaster_id"]
     # Delete any existing tasks for this user and disaster before saving the new one
     try:
-        existing_tasks = appwrite_service.list_tasks_by_user_and_disaster(
+        existing_tasks = await appwrite_service.alist_tasks_by_user_and_disaster(
             user_id, disaster_id
         )
-        for task in existing_tasks:
-            task_id = task.get("$id") or task.get("task_id")
-            # Only delete if first_Task is False (or missing)
-            if task_id and not task.get("first_Task", False):
-                try:
-                    appwrite_service.databases.delete_document(
-                        database_id=appwrite_service.database_id,
-                        collection_id=appwrite_service.tasks_collection_Id,
-                        document_id=task_id,
-                    )
-                except Exception as e:
-                    pass
-    except Exception as e:
+        # Only delete if first_Task is False (or missing)
+        ids_to_delete = [
+            task.get("$id") or task.get("task_id")
+            for task in existing_tasks
+            if (task.get("$id") or task.get("task_id"))
+            and not task.get("first_Task", False)
+        ]
+        # Issue the deletes concurrently; a failed delete must not stop the others
+        results = await asyncio.gather(
+            *[
+                appwrite_service.adelete_task_document(task_id)
+                for task_id in ids_to_delete
+            ],
+            return_exceptions=True,
+        )
+        # Only Appwrite failures are expected here, anything else is a bug
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(
+                result, AppwriteException
+            ):
+                raise result
+    except AppwriteException:
         pass
     # Now save the new task
     try:
-        appwrite_service.save_task_document(state["generated_task"])
-    except Exception as e:
+        await appwrite_service.asave_task_document(state["generated_task"])
+    except AppwriteException:
         pass
-    return state
 
 
-def save_user_request(state: EmergencyRequestState) -> EmergencyRequestState:
+async def save_user_request(state: EmergencyRequestState) -> dict:
     user_id = state["user_id"]
     disaster_id = state["disaster_id"]
     user_request_data = {
         "disaster_id": disaster_id,
         "help": state["help"],
         "urgency_type": state["urgency_type"],
-        "latitude": state["latitude"],
-        "longitude": state["longitude"],
+        # The user requests collection stores coordinates as strings
+        "latitude": str(state["latitude"]),
+        "longitude": str(state["longitude"]),
         "emergency_type": state["emergency_type"],
         "task_id": state["generated_task"]["task_id"],
         "status": "submitted",
@@ -318,30 +499,14 @@ def save_user_request(state: EmergencyRequestState) -> EmergencyRequestState:
     try:
         # Try to delete any existing request for this user
         try:
-            appwrite_service.delete_user_request_document(user_id)
-        except Exception as e:
+            await appwrite_service.adelete_user_request_document(user_id)
+        except AppwriteException:
             pass
         # Save the new request with user_id as the document ID
-        appwrite_service.save_user_request_document(user_id, user_request_data)
-    except Exception as e:
+        await appwrite_service.asave_user_request_document(user_id, user_request_data)
+    except AppwriteException:
         pass
-    return {**state, "user_request_data": user_request_data}
-
-
-def create_emergency_request_graph():
-    graph = StateGraph(EmergencyRequestState)
-    graph.add_node("fetch_disaster", fetch_disaster_type)
-    graph.add_node("fetch_resources", fetch_nearby_resources)
-    graph.add_node("generate_task", generate_emergency_task)
-    graph.add_node("save_task", save_task_to_db)
-    graph.add_node("save_request", save_user_request)
-    graph.set_entry_point("fetch_disaster")
-    graph.add_edge("fetch_disaster", "fetch_resources")
-    graph.add_edge("fetch_resources", "generate_task")
-    graph.add_edge("generate_task", "save_task")
-    graph.add_edge("save_task", "save_request")
-    graph.set_finish_point("save_request")
-    return graph.compile()
+    return {"user_request_data": user_request_data}
 
 
 async def process_emergency_request(
@@ -352,21 +517,32 @@ async def process_emergency_request(
     latitude: str,
     longitude: str,
 ):
-    graph = create_emergency_request_graph()
-    initial_state = EmergencyRequestState(
+    # The pipeline is a fixed chain with two parallel stages, so it runs as plain
+    # async code rather than through a LangGraph graph
+    state = EmergencyRequestState(
         disaster_id=disaster_id,
         user_id=user_id,
         help=help,
         urgency_type=urgency_type,
-        latitude=latitude,
-        longitude=longitude,
+        latitude=float(latitude),
+        longitude=float(longitude),
         emergency_type="",
         nearby_resources=[],
         generated_task={},
         user_request_data={},
     )
-    result = await graph.ainvoke(initial_state)
-    return result
+    # Disaster type and nearby resources are independent lookups. gather (rather than
+    # a TaskGroup) lets a lookup error reach callers unwrapped
+    state["emergency_type"], state["nearby_resources"] = await asyncio.gather(
+        fetch_disaster_type(state), fetch_nearby_resources(state)
+    )
+    state.update(await generate_emergency_task(state))
+    # The task and the user request are written independently once the task exists
+    _, user_request_update = await asyncio.gather(
+        save_task_to_db(state), save_user_request(state)
+    )
+    state.update(user_request_update)
+    return state
 
 
 def delete_task_by_id(task_id: str):
@@ -377,5 +553,5 @@ def delete_task_by_id(task_id: str):
             collection_id=appwrite_service.tasks_collection_Id,
             document_id=task_id,
         )
-    except Exception as e:
+    except AppwriteException:
         pass
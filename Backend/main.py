@@ -3,12 +3,19 @@ from app.apis.private import router as private_router
 from app.apis.public import router as public_router
 from app.apis.user import router as user_router
 from app.apis.government import router as government_router
+from app.services.appwrite_service import AppwriteService
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await AppwriteService.aclose_http_client()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
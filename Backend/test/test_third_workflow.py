@@ -0,0 +1,302 @@
+import asyncio
+import pytest
+from appwrite.exception import AppwriteException
+from cachetools import TTLCache
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Importing the workflow builds its service clients; placeholders are enough for the pure helpers
+os.environ.setdefault("APPWRITE_ENDPOINT", "http://localhost/v1")
+for var in [
+    "APPWRITE_PROJECT_ID",
+    "APPWRITE_API_KEY",
+    "APPWRITE_USERS_COLLECTION_ID",
+    "APPWRITE_DISASTERS_COLLECTION_ID",
+    "APPWRITE_AI_MATRIX_COLLECTION_ID",
+    "APPWRITE_TASKS_COLLECTION_ID",
+    "APPWRITE_USER_REQUESTS_COLLECTION_ID",
+    "APPWRITE_RESOURCES_COLLECTION_ID",
+    "GOOGLE_API_KEY",
+]:
+    os.environ.setdefault(var, "test")
+
+from app.services import third_workflow
+from app.services.third_workflow import rank_nearby_resources, match_request_keywords
+from app.models.task import GeneratedTaskOutput
+
+
+def resource(resource_id, latitude, longitude):
+    return {"$id": resource_id, "latitude": str(latitude), "longitude": str(longitude)}
+
+
+# rank_nearby_resources
+
+def test_rank_distance_in_km():
+    ranked = rank_nearby_resources([resource("r1", 1.0, 0.0)], 0.0, 0.0)
+    assert ranked[0]["resource_id"] == "r1"
+    assert ranked[0]["distance"] == pytest.approx(111.32, rel=1e-3)
+
+
+def test_rank_wraps_across_antimeridian():
+    documents = [resource("far", 0.0, 178.0), resource("across", 0.0, -179.9)]
+    ranked = rank_nearby_resources(documents, 0.0, 179.9)
+    assert [r["resource_id"] for r in ranked] == ["across", "far"]
+    assert ranked[0]["distance"] == pytest.approx(0.2 * 111.32, rel=1e-3)
+
+
+def test_rank_scales_longitude_by_latitude():
+    # At 60N a degree of longitude is about half a degree of latitude
+    documents = [resource("north", 60.8, 10.0), resource("east", 60.0, 11.0)]
+    ranked = rank_nearby_resources(documents, 60.0, 10.0)
+    assert [r["resource_id"] for r in ranked] == ["east", "north"]
+
+
+def test_rank_fewer_than_limit_skips_unlocated():
+    documents = [resource("b", 0.2, 0.0), {"$id": "none", "latitude": ""}, resource("a", 0.1, 0.0)]
+    ranked = rank_nearby_resources(documents, 0.0, 0.0)
+    assert [r["resource_id"] for r in ranked] == ["a", "b"]
+
+
+def test_rank_returns_closest_five_in_order():
+    documents = [resource(str(i), i * 0.1, 0.0) for i in range(8, 0, -1)]
+    ranked = rank_nearby_resources(documents, 0.0, 0.0)
+    assert [r["resource_id"] for r in ranked] == ["1", "2", "3", "4", "5"]
+
+
+def test_rank_empty():
+    assert rank_nearby_resources([], 0.0, 0.0) == []
+
+
+# match_request_keywords
+
+@pytest.mark.parametrize("text, expected", [
+    ("Need FOOD", {"food"}),
+    ("no meals or drinks for two days", {"food", "water"}),
+    ("flood water rising into our house", {"water"}),
+    ("fires everywhere", {"med"}),
+    ("he won't stop bleeding", {"med"}),
+    ("send kisses", {"bad"}),
+    ("many people trapped", {"mass", "med"}),
+])
+def test_keyword_categories(text, expected):
+    assert match_request_keywords(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "I will wait here",
+    "great seat near the window",
+    "my gloves are lost",
+])
+def test_keyword_substrings_do_not_match(text):
+    assert match_request_keywords(text) == set()
+
+
+# generate_emergency_task keyword short-circuit
+
+class StubGemini:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return GeneratedTaskOutput(
+            description="Rescue family from roof",
+            roles="fr",
+            reasoning="Flood rescue",
+            resource_utilization="none",
+        )
+
+
+def generate(monkeypatch, help_needed, urgency, emergency_type="flood"):
+    gemini = StubGemini()
+    monkeypatch.setattr(third_workflow, "gemini_task_output", gemini)
+    state = {
+        "disaster_id": "d1",
+        "user_id": "u1",
+        "help": help_needed,
+        "urgency_type": urgency,
+        "latitude": 6.9,
+        "longitude": 79.8,
+        "emergency_type": emergency_type,
+        "nearby_resources": [],
+    }
+    task = asyncio.run(third_workflow.generate_emergency_task(state))["generated_task"]
+    return task, gemini.calls
+
+
+def test_food_request_skips_model(monkeypatch):
+    task, calls = generate(monkeypatch, "we need food", "low")
+    assert calls == 0
+    assert task["roles"] == ["vol"]
+    assert task["ai_reasoning"] == "deterministic keyword match"
+
+
+def test_medical_request_skips_model(monkeypatch):
+    task, calls = generate(monkeypatch, "my leg is bleeding", "medium")
+    assert calls == 0
+    assert task["roles"] == ["fr"]
+
+
+def test_high_urgency_food_request_uses_model(monkeypatch):
+    task, calls = generate(monkeypatch, "we need food", "high")
+    assert calls == 1
+    assert task["roles"] == ["fr"]
+
+
+def test_flood_water_request_uses_model(monkeypatch):
+    task, calls = generate(monkeypatch, "flood water rising into our house, stuck on the roof", "medium")
+    assert calls == 1
+    assert task["roles"] == ["fr"]
+    assert task["is_fallback"] is False
+
+
+# fetch_nearby_resources bounding-box pre-filter
+
+class StubResourceService:
+    def __init__(self, bbox_documents=None, bbox_error=None, documents=()):
+        self.bbox_documents = bbox_documents
+        self.bbox_error = bbox_error
+        self.documents = list(documents)
+        self.calls = []
+
+    async def alist_resources_in_bbox(self, disaster_id, lat_min, lat_max, lon_min, lon_max, limit=100):
+        self.calls.append("bbox")
+        if self.bbox_error:
+            raise self.bbox_error
+        return self.bbox_documents
+
+    async def alist_resources_for_disaster(self, disaster_id):
+        self.calls.append("full")
+        return self.documents
+
+
+def fetch_nearby(monkeypatch, service, enabled=True):
+    monkeypatch.setattr(third_workflow, "appwrite_service", service)
+    monkeypatch.setattr(third_workflow, "_bbox_query_enabled", enabled)
+    state = {"disaster_id": "d1", "latitude": 0.0, "longitude": 0.0}
+    return asyncio.run(third_workflow.fetch_nearby_resources(state))
+
+
+def near(count):
+    # Resources 0.01 degrees (about 1 km) apart, all well inside the radius
+    return [resource(str(i), i * 0.01, 0.0) for i in range(1, count + 1)]
+
+
+def test_bbox_disabled_uses_full_listing(monkeypatch):
+    service = StubResourceService(bbox_documents=near(6), documents=near(2))
+    assert len(fetch_nearby(monkeypatch, service, enabled=False)) == 2
+    assert service.calls == ["full"]
+
+
+def test_bbox_exact_result_skips_full_listing(monkeypatch):
+    service = StubResourceService(bbox_documents=near(6))
+    ranked = fetch_nearby(monkeypatch, service)
+    assert [r["resource_id"] for r in ranked] == ["1", "2", "3", "4", "5"]
+    assert service.calls == ["bbox"]
+
+
+def test_bbox_full_page_is_inconclusive(monkeypatch):
+    service = StubResourceService(bbox_documents=near(third_workflow.BBOX_CANDIDATE_LIMIT))
+    fetch_nearby(monkeypatch, service)
+    assert service.calls == ["bbox", "full"]
+
+
+def test_bbox_fifth_result_outside_radius_falls_back(monkeypatch):
+    # The fifth candidate sits in the box corner, beyond the radius
+    corner = third_workflow.NEARBY_RESOURCE_RADIUS_KM / third_workflow.KM_PER_DEGREE * 0.9
+    service = StubResourceService(bbox_documents=near(4) + [resource("corner", corner, corner)])
+    fetch_nearby(monkeypatch, service)
+    assert service.calls == ["bbox", "full"]
+
+
+def test_bbox_too_few_results_falls_back(monkeypatch):
+    service = StubResourceService(bbox_documents=near(3))
+    fetch_nearby(monkeypatch, service)
+    assert service.calls == ["bbox", "full"]
+
+
+def test_bbox_invalid_query_disables_prefilter(monkeypatch):
+    error = AppwriteException("Invalid query", 400, "general_query_invalid")
+    service = StubResourceService(bbox_error=error, documents=near(2))
+    assert len(fetch_nearby(monkeypatch, service)) == 2
+    assert third_workflow._bbox_query_enabled is False
+    state = {"disaster_id": "d1", "latitude": 0.0, "longitude": 0.0}
+    asyncio.run(third_workflow.fetch_nearby_resources(state))
+    assert service.calls == ["bbox", "full", "full"]
+
+
+def test_bbox_other_error_keeps_prefilter(monkeypatch):
+    error = AppwriteException("Invalid argument", 400, "general_argument_invalid")
+    service = StubResourceService(bbox_error=error, documents=near(2))
+    fetch_nearby(monkeypatch, service)
+    assert third_workflow._bbox_query_enabled is True
+    assert service.calls == ["bbox", "full"]
+
+
+# get_cached_disaster_document
+
+class StubDisasterService:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    async def aget_disaster_document(self, disaster_id):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.calls <= self.failures:
+            raise AppwriteException("Unavailable", 503)
+        return {"$id": disaster_id, "emergency_type": "flood"}
+
+
+@pytest.fixture
+def disaster_service(monkeypatch):
+    def install(**kwargs):
+        service = StubDisasterService(**kwargs)
+        monkeypatch.setattr(third_workflow, "appwrite_service", service)
+        monkeypatch.setattr(third_workflow, "_disaster_cache", TTLCache(maxsize=16, ttl=60))
+        monkeypatch.setattr(third_workflow, "_disaster_fetches", {})
+        return service
+    return install
+
+
+def test_concurrent_misses_share_one_fetch(disaster_service):
+    service = disaster_service()
+
+    async def run():
+        return await asyncio.gather(
+            *[third_workflow.get_cached_disaster_document("d1") for _ in range(10)]
+        )
+
+    documents = asyncio.run(run())
+    assert service.calls == 1
+    assert all(document["emergency_type"] == "flood" for document in documents)
+    assert third_workflow._disaster_fetches == {}
+
+
+def test_failed_fetch_is_not_cached(disaster_service):
+    service = disaster_service(failures=1)
+    with pytest.raises(AppwriteException):
+        asyncio.run(third_workflow.get_cached_disaster_document("d1"))
+    assert "d1" not in third_workflow._disaster_cache
+    document = asyncio.run(third_workflow.get_cached_disaster_document("d1"))
+    assert document["emergency_type"] == "flood"
+    assert service.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch(disaster_service):
+    service = disaster_service()
+
+    async def run():
+        first = asyncio.ensure_future(third_workflow.get_cached_disaster_document("d1"))
+        second = asyncio.ensure_future(third_workflow.get_cached_disaster_document("d1"))
+        await asyncio.sleep(0)
+        first.cancel()
+        document = await second
+        return first, document
+
+    first, document = asyncio.run(run())
+    assert first.cancelled()
+    assert document["emergency_type"] == "flood"
+    assert service.calls == 1
+    assert "d1" in third_workflow._disaster_cache